@@ -1,5 +1,38 @@
+import hashlib
+import os
+import warnings
+
+import numpy as np
+
+from omlt.dependencies import (
+    numba_available,
+    onnx,
+    onnx_available,
+    onnxruntime,
+    onnxruntime_available,
+)
+
+
 class GradientBoostedTreeModel:
-    def __init__(self, onnx_model, scaling_object=None, scaled_input_bounds=None):
+    # no __dict__; the instance is just these attributes, making attribute
+    # access an offset lookup on the hot paths used by the formulation code
+    __slots__ = (
+        "__model",
+        "__n_inputs",
+        "__n_outputs",
+        "__scaling_object",
+        "__scaled_input_bounds",
+        "__node_arrays",
+        "__ort_session",
+    )
+
+    def __init__(
+        self,
+        onnx_model,
+        scaling_object=None,
+        scaled_input_bounds=None,
+        optimize_graph=True,
+    ):
         """
         Create a network definition object used to create the gradient-boosted trees
         formulation in Pyomo
@@ -16,12 +49,21 @@ class GradientBoostedTreeModel:
               A dict that contains the bounds on the scaled variables (the
               direct inputs to the tree ensemble). If None, then no bounds
               are specified or they are generated using unscaled bounds.
+           optimize_graph : bool
+              If True and onnxruntime is available, run the onnxruntime graph
+              optimizer (constant folding, dead-code elimination, operator
+              fusion) on the model before building the formulation. The
+              optimized model is semantically equivalent but may contain
+              fewer nodes.
         """
+        if optimize_graph:
+            onnx_model = _optimized_onnx_model(onnx_model)
         self.__model = onnx_model
-        self.__n_inputs = _model_num_inputs(onnx_model)
-        self.__n_outputs = _model_num_outputs(onnx_model)
+        self.__n_inputs, self.__n_outputs = _model_io_sizes(onnx_model)
         self.__scaling_object = scaling_object
         self.__scaled_input_bounds = scaled_input_bounds
+        self.__node_arrays = None
+        self.__ort_session = None
 
     @property
     def onnx_model(self):
@@ -52,40 +94,305 @@ class GradientBoostedTreeModel:
     def scaling_object(self, scaling_object):
         self.__scaling_object = scaling_object
 
+    def predict(self, X):
+        """Evaluate the tree ensemble at a batch of (scaled) input points.
 
-def _model_num_inputs(model):
-    """Returns the number of input variables"""
-    graph = model.graph
-    if len(graph.input) != 1:
+        Uses a numba-compiled tree walker that parallelizes over the batch
+        axis when numba is available, falling back to onnxruntime otherwise.
+        The tree ensemble attributes are extracted into flat numpy arrays on
+        the first call and cached on the model.
+
+        NaN inputs are not supported by the numba path: every comparison
+        against a NaN takes the false branch, ignoring the ensemble's
+        nodes_missing_value_tracks_true attribute.
+
+        Args:
+           X : array-like
+              Input points with shape (n_samples, n_inputs).
+
+        Returns:
+           A numpy array of predictions with shape (n_samples,).
+        """
+        X = np.ascontiguousarray(X, dtype=np.float64).reshape(-1, self.n_inputs)
+        if numba_available:
+            if self.__node_arrays is None:
+                # False marks models the kernel cannot handle, so a failed
+                # extraction is not re-attempted on every call
+                self.__node_arrays = _extract_node_arrays(self.__model) or False
+            if self.__node_arrays is not False:
+                out = np.empty(X.shape[0], dtype=np.float64)
+                _tree_walk_kernel()(*self.__node_arrays, X, out)
+                return out
+        if onnxruntime_available:
+            if self.__ort_session is None:
+                self.__ort_session = onnxruntime.InferenceSession(
+                    self.__model.SerializeToString(),
+                    providers=["CPUExecutionProvider"],
+                )
+            input_name = self.__ort_session.get_inputs()[0].name
+            (out,) = self.__ort_session.run(None, {input_name: X.astype(np.float32)})
+            return np.asarray(out, dtype=np.float64).reshape(-1)
         raise ValueError(
-            f"Model graph input field is multi-valued {graph.input}. A single value is required."
+            "GradientBoostedTreeModel.predict requires numba or onnxruntime."
         )
-    return _tensor_size(graph.input[0])
 
 
-def _model_num_outputs(model):
-    """Returns the number of output variables"""
+# Lazily-built numba kernel shared by all models
+_TREE_WALK_KERNEL = None
+
+
+def _tree_walk_kernel():
+    """Returns the numba-compiled batch tree-walk kernel, building it once"""
+    global _TREE_WALK_KERNEL
+    if _TREE_WALK_KERNEL is None:
+        from numba import njit, prange
+
+        @njit(parallel=True, cache=True)
+        def _walk(
+            feature_ids,
+            values,
+            true_ids,
+            false_ids,
+            is_leaf,
+            leaf_weights,
+            tree_roots,
+            base_value,
+            X,
+            out,
+        ):
+            for i in prange(X.shape[0]):
+                acc = base_value
+                for t in range(tree_roots.shape[0]):
+                    root = tree_roots[t]
+                    node = root
+                    while not is_leaf[node]:
+                        if X[i, feature_ids[node]] <= values[node]:
+                            node = root + true_ids[node]
+                        else:
+                            node = root + false_ids[node]
+                    acc += leaf_weights[node]
+                out[i] = acc
+
+        _TREE_WALK_KERNEL = _walk
+    return _TREE_WALK_KERNEL
+
+
+def _extract_node_arrays(model):
+    """Extracts the tree ensemble attributes into flat numpy arrays suitable
+    for the tree-walk kernel, or returns None if the model is not a
+    single-target regressor made of LEAF/BRANCH_LEQ nodes.
+    """
+    ensemble_node = None
+    for node in model.graph.node:
+        if node.op_type == "TreeEnsembleRegressor":
+            ensemble_node = node
+            break
+    if ensemble_node is None:
+        return None
+    attr = {a.name: a for a in ensemble_node.attribute}
+    # opset-3 models may carry the *_as_tensor attribute variants instead of
+    # the plain lists read below; defer those to onnxruntime
+    if any(name.endswith("_as_tensor") for name in attr):
+        return None
+    required = (
+        "n_targets",
+        "nodes_treeids",
+        "nodes_nodeids",
+        "nodes_featureids",
+        "nodes_values",
+        "nodes_truenodeids",
+        "nodes_falsenodeids",
+        "nodes_modes",
+        "target_treeids",
+        "target_nodeids",
+        "target_weights",
+    )
+    if any(name not in attr for name in required):
+        return None
+    if attr["n_targets"].i != 1:
+        return None
+    # the kernel computes the raw sum of leaf weights, so bail out on any
+    # post-transform or non-SUM aggregation and let onnxruntime handle it
+    if "post_transform" in attr and attr["post_transform"].s not in (b"", b"NONE"):
+        return None
+    if "aggregate_function" in attr and attr["aggregate_function"].s not in (
+        b"",
+        b"SUM",
+    ):
+        return None
+    modes = np.array(attr["nodes_modes"].strings)
+    if not np.all((modes == b"LEAF") | (modes == b"BRANCH_LEQ")):
+        return None
+
+    tree_ids = np.array(attr["nodes_treeids"].ints)
+    node_ids = np.array(attr["nodes_nodeids"].ints)
+    # flatten to one contiguous array ordered by (tree, node id) so a node's
+    # flat index is its tree root offset plus its in-tree id
+    order = np.lexsort((node_ids, tree_ids))
+    tree_ids = tree_ids[order]
+    node_ids = node_ids[order]
+    feature_ids = np.ascontiguousarray(attr["nodes_featureids"].ints, dtype=np.int32)[
+        order
+    ]
+    values = np.ascontiguousarray(attr["nodes_values"].floats, dtype=np.float64)[order]
+    true_ids = np.ascontiguousarray(attr["nodes_truenodeids"].ints, dtype=np.int32)[
+        order
+    ]
+    false_ids = np.ascontiguousarray(attr["nodes_falsenodeids"].ints, dtype=np.int32)[
+        order
+    ]
+    is_leaf = modes[order] == b"LEAF"
+
+    unique_trees, tree_roots = np.unique(tree_ids, return_index=True)
+    tree_sizes = np.diff(np.append(tree_roots, len(node_ids)))
+    expected_ids = np.concatenate([np.arange(size) for size in tree_sizes])
+    if not np.array_equal(node_ids, expected_ids):
+        return None
+    root_by_tree = dict(zip(unique_trees, tree_roots))
+
+    leaf_weights = np.zeros(len(node_ids), dtype=np.float64)
+    for tree, node, weight in zip(
+        attr["target_treeids"].ints,
+        attr["target_nodeids"].ints,
+        attr["target_weights"].floats,
+    ):
+        leaf_weights[root_by_tree[tree] + node] = weight
+
+    base_value = float(attr["base_values"].floats[0]) if "base_values" in attr else 0.0
+    return (
+        feature_ids,
+        values,
+        true_ids,
+        false_ids,
+        is_leaf,
+        leaf_weights,
+        np.ascontiguousarray(tree_roots, dtype=np.int64),
+        base_value,
+    )
+
+
+def _optimized_onnx_model(onnx_model):
+    """Returns a semantically equivalent model with the basic onnxruntime
+    graph optimizations applied, or the original model if onnxruntime is not
+    available or cannot optimize it.
+
+    Optimized models are cached in a per-user directory keyed by a hash of
+    the original model bytes, so repeated runs over the same model skip
+    re-optimization.
+    """
+    if not (onnx_available and onnxruntime_available):
+        return onnx_model
+    model_bytes = onnx_model.SerializeToString()
+    digest = hashlib.sha256(model_bytes).hexdigest()[:16]
+    # cache in a private per-user directory; a shared location such as the
+    # temp directory would let other local users pre-create the cache file
+    cache_dir = os.path.join(os.path.expanduser("~"), ".cache", "omlt")
+    try:
+        os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+        os.chmod(cache_dir, 0o700)
+    except OSError as err:
+        # read-only or missing HOME (containers, CI); optimization is
+        # best-effort, so skip it rather than fail the construction
+        warnings.warn(
+            f"could not create the omlt cache directory ({err}); "
+            "using the unoptimized model",
+            stacklevel=2,
+        )
+        return onnx_model
+    optimized_path = os.path.join(cache_dir, f"gbt-optimized-{digest}.onnx")
+    if os.path.exists(optimized_path):
+        try:
+            cached_model = onnx.load(optimized_path)
+            # a truncated file can still parse as an empty message, so
+            # check the graph IO survived before trusting the cache
+            if not (cached_model.graph.input and cached_model.graph.output):
+                raise ValueError("cached model is missing its graph IO")
+            return cached_model
+        except Exception as err:
+            # an interrupted writer can leave a truncated file behind;
+            # discard it and re-optimize
+            warnings.warn(
+                f"discarding corrupt cached model {optimized_path} ({err})",
+                stacklevel=2,
+            )
+            try:
+                os.remove(optimized_path)
+            except OSError:
+                pass
+    # onnxruntime writes the optimized model non-atomically, so point it at
+    # a unique scratch name and move the result into place once complete;
+    # interrupted or racing writers then never leave a truncated file at
+    # the final path
+    scratch_path = f"{optimized_path}.{os.getpid()}.tmp"
+    session_options = onnxruntime.SessionOptions()
+    # basic optimizations only: the saved model is consumed by the
+    # formulation parser, and the extended levels can emit fused
+    # com.microsoft ops it does not understand
+    session_options.graph_optimization_level = (
+        onnxruntime.GraphOptimizationLevel.ORT_ENABLE_BASIC
+    )
+    session_options.optimized_model_filepath = scratch_path
+    session_options.log_severity_level = 3
+    try:
+        onnxruntime.InferenceSession(
+            model_bytes, session_options, providers=["CPUExecutionProvider"]
+        )
+        optimized_model = onnx.load(scratch_path)
+        os.replace(scratch_path, optimized_path)
+        return optimized_model
+    # onnxruntime errors (Fail, InvalidGraph, ...) subclass Exception
+    # directly, so there is no narrower common base to catch
+    except Exception as err:
+        warnings.warn(
+            f"onnxruntime could not optimize the model ({err}); "
+            "using the unoptimized model",
+            stacklevel=2,
+        )
+        return onnx_model
+    finally:
+        if os.path.exists(scratch_path):
+            try:
+                os.remove(scratch_path)
+            except OSError:
+                pass
+
+
+def _model_io_sizes(model):
+    """Returns the number of input and output variables in one graph sweep"""
     graph = model.graph
+    if len(graph.input) != 1:
+        raise ValueError(
+            f"Model graph input field is multi-valued {graph.input}. A single value is required."
+        )
     if len(graph.output) != 1:
         raise ValueError(
             f"Model graph output field is multi-valued {graph.output}. A single value is required."
         )
-    return _tensor_size(graph.output[0])
+    return _tensor_size(graph.input[0]), _tensor_size(graph.output[0])
+
+
+def _model_num_inputs(model):
+    """Returns the number of input variables"""
+    return _model_io_sizes(model)[0]
+
+
+def _model_num_outputs(model):
+    """Returns the number of output variables"""
+    return _model_io_sizes(model)[1]
 
 
 def _tensor_size(tensor):
     """Returns the size of an input tensor"""
     tensor_type = tensor.type.tensor_type
-    size = None
-    dim_values = [
-        dim.dim_value
-        for dim in tensor_type.shape.dim
-        if dim.dim_value is not None and dim.dim_value > 0
-    ]
-    if len(dim_values) == 1:
-        size = dim_values[0]
-    elif dim_values == []:
+    # single pass over the dims, raising as soon as a second positive
+    # dimension is seen
+    size = -1
+    for dim in tensor_type.shape.dim:
+        dim_value = dim.dim_value
+        if dim_value is not None and dim_value > 0:
+            if size != -1:
+                raise ValueError(f"Tensor {tensor} has multiple positive dimensions.")
+            size = dim_value
+    if size == -1:
         raise ValueError(f"Tensor {tensor} has no positive dimensions.")
-    else:
-        raise ValueError(f"Tensor {tensor} has multiple positive dimensions.")
     return size
@@ -1,16 +1,32 @@
-from omlt.dependencies import (
-    keras_available,
-    onnx_available,
-    torch_available,
-    torch_geometric_available,
-)
+import importlib
 
-if onnx_available:
-    from omlt.io.onnx import (
-        load_onnx_neural_network,
-        load_onnx_neural_network_with_bounds,
-        write_onnx_model_with_bounds,
-    )
+# Map each public name to the submodule that provides it. Submodules (and
+# their heavy backends: onnx, tensorflow/keras, torch_geometric) are only
+# imported on first attribute access, so importing omlt.io stays cheap.
+_LAZY_IMPORTS = {
+    "load_onnx_neural_network": "omlt.io.onnx",
+    "load_onnx_neural_network_with_bounds": "omlt.io.onnx",
+    "write_onnx_model_with_bounds": "omlt.io.onnx",
+    "load_keras_sequential": "omlt.io.keras",
+    "load_torch_geometric_sequential": "omlt.io.torch_geometric",
+    "gnn_with_fixed_graph": "omlt.io.torch_geometric",
+    "gnn_with_non_fixed_graph": "omlt.io.torch_geometric",
+}
 
-if keras_available:
-    from omlt.io.keras import load_keras_sequential
+__all__ = list(_LAZY_IMPORTS)
+
+
+def __getattr__(name):
+    try:
+        module_name = _LAZY_IMPORTS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(module_name)
+    value = getattr(module, name)
+    # cache so subsequent lookups bypass __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
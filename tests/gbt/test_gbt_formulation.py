@@ -1,10 +1,16 @@
 from pathlib import Path
 
+import numpy as np
 import pyomo.environ as pe
 import pytest
 
 from omlt import OmltBlock
-from omlt.dependencies import onnx, onnx_available
+from omlt.dependencies import (
+    onnx,
+    onnx_available,
+    onnxruntime,
+    onnxruntime_available,
+)
 from omlt.gbt.gbt_formulation import GBTBigMFormulation
 from omlt.gbt.model import GradientBoostedTreeModel
 
@@ -97,3 +103,26 @@ def test_big_m_formulation_block_with_dimension_subset():
     # if it can build the formulation it means it is handling the lack
     # of all dimension
     m.mod.build_formulation(formulation)
+
+
+@pytest.mark.skipif(
+    not (onnx_available and onnxruntime_available),
+    reason="Need ONNX and onnxruntime for this test",
+)
+def test_model_predict():
+    onnx_model = onnx.load(Path(__file__).parent / "continuous_model.onnx")
+    model = GradientBoostedTreeModel(onnx_model)
+
+    rng = np.random.default_rng(42)
+    x = rng.uniform(-2.0, 2.0, (25, model.n_inputs))
+
+    predictions = model.predict(x)
+
+    session = onnxruntime.InferenceSession(
+        onnx_model.SerializeToString(), providers=["CPUExecutionProvider"]
+    )
+    input_name = session.get_inputs()[0].name
+    expected = session.run(None, {input_name: x.astype(np.float32)})[0].reshape(-1)
+
+    assert predictions.shape == (25,)
+    assert np.max(np.abs(predictions - expected)) < 1e-4
@@ -35,12 +35,16 @@ def _test_keras_linear_131(keras_fname, reduced_space=False):
         formulation = FullSpaceNNFormulation(net)
     m.neural_net_block.build_formulation(formulation)
 
-    nn_outputs = nn.predict(x=x_test)
+    x_test = np.ascontiguousarray(x_test, dtype=np.float64).reshape(len(x_test), -1)
+    solver = pyo.SolverFactory("ipopt")
+    nn_outputs = np.asarray(
+        nn.predict(x_test, batch_size=len(x_test), verbose=0)
+    ).reshape(len(x_test), -1)
     for d in range(len(x_test)):
-        m.neural_net_block.inputs[0].fix(x_test[d])
-        status = pyo.SolverFactory("ipopt").solve(m, tee=False)
+        m.neural_net_block.inputs[0].fix(float(x_test[d, 0]))
+        status = solver.solve(m, tee=False)
         pyo.assert_optimal_termination(status)
-        assert abs(pyo.value(m.neural_net_block.outputs[0]) - nn_outputs[d][0]) < 1e-5
+        assert abs(pyo.value(m.neural_net_block.outputs[0]) - nn_outputs[d, 0]) < 1e-5
 
 
 def _test_keras_mip_relu_131(keras_fname):
@@ -55,12 +59,16 @@ def _test_keras_mip_relu_131(keras_fname):
     m.neural_net_block.build_formulation(formulation)
     m.obj = pyo.Objective(expr=0)
 
-    nn_outputs = nn.predict(x=x_test)
+    x_test = np.ascontiguousarray(x_test, dtype=np.float64).reshape(len(x_test), -1)
+    solver = pyo.SolverFactory("cbc")
+    nn_outputs = np.asarray(
+        nn.predict(x_test, batch_size=len(x_test), verbose=0)
+    ).reshape(len(x_test), -1)
     for d in range(len(x_test)):
-        m.neural_net_block.inputs[0].fix(x_test[d])
-        status = pyo.SolverFactory("cbc").solve(m, tee=False)
+        m.neural_net_block.inputs[0].fix(float(x_test[d, 0]))
+        status = solver.solve(m, tee=False)
         pyo.assert_optimal_termination(status)
-        assert abs(pyo.value(m.neural_net_block.outputs[0]) - nn_outputs[d][0]) < 1e-5
+        assert abs(pyo.value(m.neural_net_block.outputs[0]) - nn_outputs[d, 0]) < 1e-5
 
 
 def _test_keras_complementarity_relu_131(keras_fname):
@@ -76,12 +84,16 @@ def _test_keras_complementarity_relu_131(keras_fname):
     )
     m.neural_net_block.build_formulation(formulation)
 
-    nn_outputs = nn.predict(x=x_test)
+    x_test = np.ascontiguousarray(x_test, dtype=np.float64).reshape(len(x_test), -1)
+    solver = pyo.SolverFactory("ipopt")
+    nn_outputs = np.asarray(
+        nn.predict(x_test, batch_size=len(x_test), verbose=0)
+    ).reshape(len(x_test), -1)
     for d in range(len(x_test)):
-        m.neural_net_block.inputs[0].fix(x_test[d])
-        status = pyo.SolverFactory("ipopt").solve(m, tee=False)
+        m.neural_net_block.inputs[0].fix(float(x_test[d, 0]))
+        status = solver.solve(m, tee=False)
         pyo.assert_optimal_termination(status)
-        assert abs(pyo.value(m.neural_net_block.outputs[0]) - nn_outputs[d][0]) < 1e-4
+        assert abs(pyo.value(m.neural_net_block.outputs[0]) - nn_outputs[d, 0]) < 1e-4
 
 
 def _test_keras_linear_big(keras_fname, reduced_space=False):
@@ -98,12 +110,16 @@ def _test_keras_linear_big(keras_fname, reduced_space=False):
         formulation = FullSpaceNNFormulation(net)
     m.neural_net_block.build_formulation(formulation)
 
-    nn_outputs = nn.predict(x=x_test)
+    x_test = np.ascontiguousarray(x_test, dtype=np.float64).reshape(len(x_test), -1)
+    solver = pyo.SolverFactory("ipopt")
+    nn_outputs = np.asarray(
+        nn.predict(x_test, batch_size=len(x_test), verbose=0)
+    ).reshape(len(x_test), -1)
     for d in range(len(x_test)):
-        m.neural_net_block.inputs[0].fix(x_test[d])
-        status = pyo.SolverFactory("ipopt").solve(m, tee=False)
+        m.neural_net_block.inputs[0].fix(float(x_test[d, 0]))
+        status = solver.solve(m, tee=False)
         pyo.assert_optimal_termination(status)
-        assert abs(pyo.value(m.neural_net_block.outputs[0]) - nn_outputs[d][0]) < 1e-5
+        assert abs(pyo.value(m.neural_net_block.outputs[0]) - nn_outputs[d, 0]) < 1e-5
 
 
 @pytest.mark.skipif(not keras_available, reason="Need keras for this test")
@@ -183,12 +199,15 @@ def test_scaling_NN_block(datadir):
     def obj(mdl):
         return 1
 
-    for x in np.random.normal(1, 0.5, 10):
-        model.nn.inputs[0].fix(x)
-        result = pyo.SolverFactory("cbc").solve(model, tee=False)
+    # predict all samples in one batched call instead of once per iteration
+    xs = np.random.normal(1, 0.5, 10)
+    xs_scaled = (xs - scale_x[0]) / scale_x[1]
+    ys_scaled = NN.predict(xs_scaled.reshape(-1, 1), verbose=0)
+    ys = ys_scaled * scale_y[1] + scale_y[0]
 
-        x_s = (x - scale_x[0]) / scale_x[1]
-        y_s = NN.predict([np.array((x_s,))])
-        y = y_s * scale_y[1] + scale_y[0]
+    solver = pyo.SolverFactory("cbc")
+    for d, x in enumerate(xs):
+        model.nn.inputs[0].fix(x)
+        result = solver.solve(model, tee=False)
 
-        assert y - pyo.value(model.nn.outputs[0]) <= 1e-3
+        assert ys[d] - pyo.value(model.nn.outputs[0]) <= 1e-3